@@ -5,34 +5,102 @@
 from __future__ import print_function
 import os
 import subprocess
+import asyncio
+import shutil
+import functools
 import time
 import ctypes
 from ctypes import wintypes
-import psutil
 import sys
-import argparse
+import re
+import logging
+import threading
+import importlib.util
+import bisect
 
-# Try to import win32 modules, but make them optional
-try:
-    import win32api, win32gui, win32process, win32com.client, win32con
-    WIN32_AVAILABLE = True
-except ImportError:
+# Verbose (-v) output is logged at DEBUG so it is only formatted when enabled
+log = logging.getLogger(__name__)
+
+# psutil, argparse, concurrent.futures and pywin32 are imported where they are
+# used so that startup (and --help) doesn't pay for loading them up front
+
+# Check for pywin32 without importing it, it is optional. This only tells us it's
+# installed; if the deferred import then fails, _win32_import_failed() clears it.
+WIN32_AVAILABLE = importlib.util.find_spec("win32com") is not None
+if not WIN32_AVAILABLE:
     print("Warning: pywin32 not available. Using limited functionality.")
-    WIN32_AVAILABLE = False
 
 # DWM constants for virtual desktop detection
 DWMWA_CLOAKED = 14
 
+# Process access rights for OpenProcess
+PROCESS_TERMINATE = 0x0001
+PROCESS_SET_QUOTA = 0x0100
+PROCESS_QUERY_INFORMATION = 0x0400
+PROCESS_SUSPEND_RESUME = 0x0800
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+SYNCHRONIZE = 0x00100000
+
+# WinEvent constants for tracking cloak changes without polling DWM
+EVENT_OBJECT_CLOAKED = 0x8017
+EVENT_OBJECT_UNCLOAKED = 0x8018
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+PM_NOREMOVE = 0x0000
+WM_QUIT = 0x0012
+
+# NtQuerySystemInformation constants for the process name snapshot
+SystemProcessInformation = 5
+STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+
+class UNICODE_STRING(ctypes.Structure):
+    _fields_ = [
+        ('Length', ctypes.c_ushort),
+        ('MaximumLength', ctypes.c_ushort),
+        ('Buffer', ctypes.c_void_p),
+    ]
+
+class SYSTEM_PROCESS_INFORMATION(ctypes.Structure):
+    """Leading fields of SYSTEM_PROCESS_INFORMATION (only the ones we read)"""
+    _fields_ = [
+        ('NextEntryOffset', ctypes.c_ulong),
+        ('NumberOfThreads', ctypes.c_ulong),
+        ('WorkingSetPrivateSize', ctypes.c_longlong),
+        ('HardFaultCount', ctypes.c_ulong),
+        ('NumberOfThreadsHighWatermark', ctypes.c_ulong),
+        ('CycleTime', ctypes.c_ulonglong),
+        ('CreateTime', ctypes.c_longlong),
+        ('UserTime', ctypes.c_longlong),
+        ('KernelTime', ctypes.c_longlong),
+        ('ImageName', UNICODE_STRING),
+        ('BasePriority', ctypes.c_long),
+        ('UniqueProcessId', ctypes.c_void_p),
+    ]
+
 # Define supported executable extensions
-EXECUTABLE_EXTENSIONS = {'.exe', '.bat', '.cmd', '.ahk', '.ps1', '.vbs', '.com'}
+EXECUTABLE_EXTENSIONS = frozenset({'.exe', '.bat', '.cmd', '.ahk', '.ps1', '.vbs', '.com'})
+_EXEC_SUFFIXES = tuple(EXECUTABLE_EXTENSIONS)  # For str.endswith()
 
 class WindowInfo:
     """Simple container for window information"""
-    def __init__(self, hwnd, title, process_name):
+    # One per enumerated window, so skip the per-instance __dict__
+    __slots__ = ('id', 'text', '_process_name', '_resolver', 'is_on_active_desktop')
+    
+    def __init__(self, hwnd, title, process_name=None, resolver=None):
         self.id = hwnd
         self.text = title
-        self.process_name = process_name
+        self._process_name = process_name
+        self._resolver = resolver  # Called with hwnd to look up process_name on demand
         self.is_on_active_desktop = True  # Will be set by detection
+    
+    @property
+    def process_name(self):
+        """Process name, resolved on first access when a resolver was given"""
+        if self._process_name is None and self._resolver is not None:
+            self._process_name = self._resolver(self.id)
+            self._resolver = None
+        return self._process_name
 
 class VirtualDesktopDetector:
     """Handles virtual desktop detection using DWM cloaking"""
@@ -41,15 +109,145 @@ class VirtualDesktopDetector:
         self.dwmapi = ctypes.WinDLL("dwmapi")
         self.user32 = ctypes.WinDLL("user32")
         self.kernel32 = ctypes.WinDLL("kernel32")
-        self.psapi = ctypes.WinDLL("psapi")
+        self.ntdll = ctypes.WinDLL("ntdll")
+        
+        # Callback type for EnumWindows, built once instead of per enumeration
+        self.WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        
+        # Declare prototypes for the per-window calls so ctypes doesn't have to
+        # guess argument conversions on every call
+        self.user32.EnumWindows.argtypes = [self.WNDENUMPROC, wintypes.LPARAM]
+        self.user32.EnumWindows.restype = wintypes.BOOL
+        self.user32.IsWindowVisible.argtypes = [wintypes.HWND]
+        self.user32.IsWindowVisible.restype = wintypes.BOOL
+        self.user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+        self.user32.GetWindowTextLengthW.restype = ctypes.c_int
+        self.user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+        self.user32.GetWindowTextW.restype = ctypes.c_int
+        self.user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        self.user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+        self.dwmapi.DwmGetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD,
+                                                      ctypes.c_void_p, wintypes.DWORD]
+        self.dwmapi.DwmGetWindowAttribute.restype = ctypes.c_long
+        self.kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        self.kernel32.OpenProcess.restype = wintypes.HANDLE
+        self.kernel32.QueryFullProcessImageNameW.argtypes = [wintypes.HANDLE, wintypes.DWORD,
+                                                             wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+        self.kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+        self.kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        
+        # Image path buffer reused by get_process_name_from_hwnd (guarded, since
+        # window checks may run on several worker threads)
+        self._image_name = ctypes.create_unicode_buffer(32768)
+        self._image_name_lock = threading.Lock()
+        
+        # Cloaked state per hwnd as (pid, cloaked), primed from DWM on first
+        # sight and then kept current by a WinEvent hook so later enumerations
+        # can skip the DWM query
+        self._cloaked = {}
+        self._hooked = False
+        self._hook_thread = None
+        self._hook_thread_id = None
+        try:
+            self._start_cloak_hook()
+        except:
+            self._hooked = False
+    
+    def _start_cloak_hook(self):
+        """Start the thread that owns the cloak/uncloak WinEvent hook"""
+        WINEVENTPROC = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        self.user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE,
+                                                WINEVENTPROC, wintypes.DWORD, wintypes.DWORD,
+                                                wintypes.DWORD]
+        self.user32.SetWinEventHook.restype = wintypes.HANDLE
+        self.user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+        self.user32.UnhookWinEvent.restype = wintypes.BOOL
+        self.user32.PeekMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND,
+                                             wintypes.UINT, wintypes.UINT, wintypes.UINT]
+        self.user32.PeekMessageW.restype = wintypes.BOOL
+        self.user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND,
+                                            wintypes.UINT, wintypes.UINT]
+        self.user32.GetMessageW.restype = wintypes.BOOL
+        self.user32.PostThreadMessageW.argtypes = [wintypes.DWORD, wintypes.UINT,
+                                                   wintypes.WPARAM, wintypes.LPARAM]
+        self.user32.PostThreadMessageW.restype = wintypes.BOOL
+        
+        # Keep a reference to the callback, it must outlive the hook
+        self._win_event_proc = WINEVENTPROC(self._on_win_event)
+        
+        # Out-of-context events are delivered to the thread that installed the
+        # hook, so give it a thread of its own that always drains its queue
+        ready = threading.Event()
+        self._hook_thread = threading.Thread(target=self._run_cloak_hook, args=(ready,),
+                                             name="cloak-hook", daemon=True)
+        self._hook_thread.start()
+        ready.wait(1.0)
+    
+    def _run_cloak_hook(self, ready):
+        """Hook thread: install the hook and deliver its events until close()"""
+        hook = None
+        msg = wintypes.MSG()
+        try:
+            self._hook_thread_id = self.kernel32.GetCurrentThreadId()
+            # Create the message queue now so close() can always post WM_QUIT
+            self.user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_NOREMOVE)
+            hook = self.user32.SetWinEventHook(EVENT_OBJECT_CLOAKED, EVENT_OBJECT_UNCLOAKED, None,
+                                               self._win_event_proc, 0, 0, WINEVENT_OUTOFCONTEXT)
+            self._hooked = bool(hook)
+        except:
+            hook = None
+        finally:
+            ready.set()
+        if not hook:
+            return
+        
+        try:
+            # Hook callbacks run while the message queue is being read
+            while self.user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                self.user32.TranslateMessage(ctypes.byref(msg))
+                self.user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            self._hooked = False
+            self.user32.UnhookWinEvent(hook)
+            self._cloaked.clear()
+    
+    def close(self):
+        """Remove the cloak hook and stop its thread"""
+        if self._hook_thread and self._hook_thread.is_alive():
+            self.user32.PostThreadMessageW(self._hook_thread_id, WM_QUIT, 0, 0)
+            self._hook_thread.join(1.0)
+        self._hook_thread = None
+    
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        """WinEvent callback: record cloak changes"""
+        if not hwnd or id_object != OBJID_WINDOW or id_child != CHILDID_SELF:
+            return
+        self._cloaked[hwnd] = (self.get_window_pid(hwnd), event == EVENT_OBJECT_CLOAKED)
+    
+    def _prune_cloak_cache(self, hwnds):
+        """Forget windows that no longer exist (there is no destroy hook to do it)"""
+        if self._cloaked:
+            for stale in set(self._cloaked) - set(hwnds):
+                self._cloaked.pop(stale, None)
         
-    def is_window_on_current_desktop(self, hwnd):
+    def is_window_on_current_desktop(self, hwnd, use_cache=False):
         """Check if window is on current virtual desktop using DWM cloaking"""
         try:
             # Check if window is visible
             if not self.user32.IsWindowVisible(hwnd):
                 return False
             
+            # Use the hook-maintained state when we have it. The pid guards
+            # against a handle that has been reused by another program's window.
+            if use_cache:
+                pid = self.get_window_pid(hwnd)
+                entry = self._cloaked.get(hwnd)
+                if entry is not None and entry[0] == pid:
+                    return not entry[1]
+            
             # Check cloaked state
             cloaked = ctypes.c_int(0)
             result = self.dwmapi.DwmGetWindowAttribute(
@@ -59,6 +257,10 @@ class VirtualDesktopDetector:
                 ctypes.sizeof(cloaked)
             )
             
+            if use_cache and result == 0:
+                # An event that arrived meanwhile is newer than what we just read
+                self._cloaked.setdefault(hwnd, (pid, cloaked.value != 0))
+            
             # Window is on current desktop if not cloaked
             return result == 0 and cloaked.value == 0
         except:
@@ -75,29 +277,97 @@ class VirtualDesktopDetector:
         self.user32.GetWindowTextW(hwnd, buffer, length + 1)
         return buffer.value
     
+    def get_window_pid(self, hwnd):
+        """Get the ID of the process that owns a window"""
+        pid = wintypes.DWORD()
+        self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        return pid.value
+    
+    def get_pid_name_map(self):
+        """Snapshot {pid: image name} for all processes with one NtQuerySystemInformation call
+        
+        Returns None if the snapshot could not be taken.
+        """
+        size = 0x40000
+        for _ in range(4):
+            buffer = ctypes.create_string_buffer(size)
+            needed = ctypes.c_ulong(0)
+            status = self.ntdll.NtQuerySystemInformation(
+                SystemProcessInformation,
+                buffer,
+                size,
+                ctypes.byref(needed)
+            ) & 0xFFFFFFFF
+            
+            if status == STATUS_INFO_LENGTH_MISMATCH:
+                # Process list grew since the size was reported, retry with headroom
+                size = max(size * 2, needed.value + 0x10000)
+                continue
+            if status != 0:
+                return None
+            break
+        else:
+            return None
+        
+        # Walk the linked list of entries packed into the buffer
+        pid_names = {}
+        offset = 0
+        while True:
+            entry = SYSTEM_PROCESS_INFORMATION.from_buffer(buffer, offset)
+            pid = entry.UniqueProcessId or 0
+            if entry.ImageName.Buffer:
+                pid_names[pid] = ctypes.wstring_at(entry.ImageName.Buffer,
+                                                   entry.ImageName.Length // 2)
+            else:
+                pid_names[pid] = "System Idle Process" if pid == 0 else "Unknown"
+            
+            if not entry.NextEntryOffset:
+                break
+            offset += entry.NextEntryOffset
+        
+        return pid_names
+    
+    def make_process_name_resolver(self):
+        """Return a hwnd -> process name lookup backed by a single process snapshot"""
+        pid_names = None
+        snapshot_taken = False
+        
+        def resolve(hwnd):
+            nonlocal pid_names, snapshot_taken
+            # Take the snapshot on first use so title-only enumerations never pay for it
+            if not snapshot_taken:
+                try:
+                    pid_names = self.get_pid_name_map()
+                except:
+                    pid_names = None
+                snapshot_taken = True
+            
+            if pid_names is None:
+                # Snapshot unavailable, open the process directly
+                return self.get_process_name_from_hwnd(hwnd)
+            return pid_names.get(self.get_window_pid(hwnd), "Unknown")
+        
+        return resolve
+    
     def get_process_name_from_hwnd(self, hwnd):
         """Get process name from window handle"""
         try:
             # Get process ID
-            pid = wintypes.DWORD()
-            self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+            pid = self.get_window_pid(hwnd)
             
-            # Open process
-            PROCESS_QUERY_INFORMATION = 0x0400
-            PROCESS_VM_READ = 0x0010
-            handle = self.kernel32.OpenProcess(
-                PROCESS_QUERY_INFORMATION | PROCESS_VM_READ,
-                False,
-                pid.value
-            )
+            # Limited query rights are enough for the image name, and unlike
+            # reading process memory they are granted for elevated processes too
+            handle = self.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
             
             if handle:
-                # Get process name
-                filename = ctypes.create_unicode_buffer(260)  # MAX_PATH
-                if self.psapi.GetModuleBaseNameW(handle, None, filename, 260):
+                try:
+                    with self._image_name_lock:
+                        size = wintypes.DWORD(len(self._image_name))
+                        if self.kernel32.QueryFullProcessImageNameW(handle, 0, self._image_name,
+                                                                    ctypes.byref(size)):
+                            return os.path.basename(self._image_name.value)
+                finally:
                     self.kernel32.CloseHandle(handle)
-                    return filename.value
-                self.kernel32.CloseHandle(handle)
         except:
             pass
         
@@ -106,81 +376,229 @@ class VirtualDesktopDetector:
     def enumerate_desktop_windows(self):
         """Enumerate all windows on current desktop"""
         windows = []
+        resolve_process_name = self.make_process_name_resolver()
+        
+        # Keep the callback trivial: it only collects handles, so each of the
+        # per-window C -> Python transitions does as little work as possible
+        hwnds = []
         
         def enum_handler(hwnd, param):
+            hwnds.append(hwnd)
+            return True
+        
+        # Enumerate windows
+        self.user32.EnumWindows(self.WNDENUMPROC(enum_handler), 0)
+        
+        # The hook thread keeps the cloak cache current; just drop dead windows
+        use_cache = self._hooked
+        if use_cache:
+            self._prune_cloak_cache(hwnds)
+        
+        for hwnd in hwnds:
             # Skip windows without titles
             title = self.get_window_text(hwnd)
             if not title:
-                return True
+                continue
             
             # Check if on current desktop
-            if self.is_window_on_current_desktop(hwnd):
-                process_name = self.get_process_name_from_hwnd(hwnd)
-                window = WindowInfo(hwnd, title, process_name)
+            if self.is_window_on_current_desktop(hwnd, use_cache):
+                # Process name is only looked up if a caller actually reads it
+                window = WindowInfo(hwnd, title, resolver=resolve_process_name)
                 window.is_on_active_desktop = True
                 windows.append(window)
-            
-            return True
-        
-        # Define the callback type
-        WNDENUMPROC = ctypes.WINFUNCTYPE(
-            ctypes.c_bool,
-            ctypes.POINTER(ctypes.c_int),
-            ctypes.POINTER(ctypes.c_int)
-        )
-        
-        # Enumerate windows
-        self.user32.EnumWindows(WNDENUMPROC(enum_handler), 0)
         
         return windows
 
+# Shared detector so the DLL handles are only loaded once per run
+_detector = None
+_detector_lock = threading.Lock()  # Snapshots may be taken from several worker threads
+
+def get_detector():
+    """Return the shared VirtualDesktopDetector, creating it on first use"""
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = VirtualDesktopDetector()
+    return _detector
+
+def close_detector():
+    """Remove the shared detector's WinEvent hook, if a detector was created"""
+    if _detector:
+        _detector.close()
+
 class SimpleDesktop:
     """Mimics the pyWinVirtualDesktop desktop interface"""
     def __init__(self):
         self.id = "current"
         self.is_active = True
-        self._detector = VirtualDesktopDetector()
+        self._detector = get_detector()
     
     def __iter__(self):
         """Iterate through windows on this desktop"""
         return iter(self._detector.enumerate_desktop_windows())
 
+# Toolhelp32 constants for the fallback process list
+TH32CS_SNAPPROCESS = 0x00000002
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+class PROCESSENTRY32W(ctypes.Structure):
+    _fields_ = [
+        ('dwSize', wintypes.DWORD),
+        ('cntUsage', wintypes.DWORD),
+        ('th32ProcessID', wintypes.DWORD),
+        ('th32DefaultHeapID', ctypes.c_void_p),
+        ('th32ModuleID', wintypes.DWORD),
+        ('cntThreads', wintypes.DWORD),
+        ('th32ParentProcessID', wintypes.DWORD),
+        ('pcPriClassBase', wintypes.LONG),
+        ('dwFlags', wintypes.DWORD),
+        ('szExeFile', wintypes.WCHAR * 260),  # MAX_PATH
+    ]
+
+# kernel32 with the Toolhelp32 prototypes declared, loaded on first use
+_toolhelp_kernel32 = None
+
+def get_toolhelp_kernel32():
+    """Return the shared Toolhelp32 kernel32 handle, or None where it isn't available"""
+    global _toolhelp_kernel32
+    if _toolhelp_kernel32 is None:
+        try:
+            kernel32 = ctypes.WinDLL("kernel32")
+            kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+            kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+            kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+            kernel32.Process32FirstW.restype = wintypes.BOOL
+            kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+            kernel32.Process32NextW.restype = wintypes.BOOL
+            kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+            _toolhelp_kernel32 = kernel32
+        except (AttributeError, OSError):
+            _toolhelp_kernel32 = False
+    return _toolhelp_kernel32 or None
+
+def _toolhelp_enum():
+    """Yield (pid, exe name) for every process from a CreateToolhelp32Snapshot"""
+    kernel32 = get_toolhelp_kernel32()
+    if kernel32 is None:
+        raise OSError("Toolhelp32 is not available")
+    
+    handle = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if not handle or handle == INVALID_HANDLE_VALUE:
+        raise ctypes.WinError()
+    
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        more = kernel32.Process32FirstW(handle, ctypes.byref(entry))
+        while more:
+            yield entry.th32ProcessID, entry.szExeFile
+            more = kernel32.Process32NextW(handle, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(handle)
+
+def snapshot_process_names():
+    """Return {pid: name} for all running processes from a single snapshot"""
+    # Toolhelp32 gives us pid + name directly without building psutil Process objects
+    try:
+        return dict(_toolhelp_enum())
+    except (AttributeError, OSError):
+        pass
+    
+    # Not on Windows (or the snapshot failed), use psutil
+    import psutil
+    
+    # psutil >= 6 caches Process instances between process_iter() calls; start fresh
+    if hasattr(psutil.process_iter, 'cache_clear'):
+        psutil.process_iter.cache_clear()
+    
+    process_names = {}
+    for proc in psutil.process_iter(['pid', 'name']):
+        process_names[proc.info['pid']] = proc.info['name']
+    return process_names
+
 class FallbackDesktop:
     """Fallback when DWM detection isn't available"""
-    def __init__(self):
+    def __init__(self, process_names=None):
         self.id = "current"
         self.is_active = True
+        self._process_names = process_names
     
     def __iter__(self):
-        """Use psutil to enumerate processes with windows"""
+        """Enumerate processes (via Toolhelp32, or psutil) as stand-in windows"""
+        # Take the process snapshot once; later iterations reuse it
+        if self._process_names is None:
+            self._process_names = snapshot_process_names()
+        
         windows = []
         
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                # Skip processes without names
-                if not proc.info['name']:
-                    continue
-                
-                # Create a fake window entry for each process
-                # This is less accurate but works as fallback
-                window = WindowInfo(
-                    proc.info['pid'],
-                    proc.info['name'],
-                    proc.info['name']
-                )
-                windows.append(window)
-            except:
+        for pid, name in self._process_names.items():
+            # Skip processes without names
+            if not name:
                 continue
+            
+            # Create a fake window entry for each process
+            # This is less accurate but works as fallback
+            windows.append(WindowInfo(pid, name, name))
         
         return iter(windows)
 
-# Create shell object globally if available
+# Shell object for the main thread, created on first use (see get_shell)
 shell = None
-if WIN32_AVAILABLE:
+_shell_created = False
+
+def _win32_import_failed(e):
+    """pywin32 is installed but broken (e.g. its post-install step never ran)"""
+    global WIN32_AVAILABLE
+    if WIN32_AVAILABLE:
+        WIN32_AVAILABLE = False
+        print(f"Warning: pywin32 not available ({e}). Using limited functionality.")
+
+def _create_shell():
+    """Create a WScript.Shell object, or None if pywin32 can't provide one"""
+    if not WIN32_AVAILABLE:
+        return None
+    try:
+        import win32com.client
+    except ImportError as e:
+        _win32_import_failed(e)
+        return None
     try:
-        shell = win32com.client.Dispatch("WScript.Shell")
+        return win32com.client.Dispatch("WScript.Shell")
     except:
-        pass
+        return None
+
+# WScript.Shell objects for worker threads (COM objects are bound to the thread
+# that created them, so the global shell above is only used on the main thread)
+_thread_local = threading.local()
+
+def _init_com_thread():
+    """Thread pool initializer: set up COM and a WScript.Shell for this thread"""
+    _thread_local.shell = None
+    if not WIN32_AVAILABLE:
+        return
+    try:
+        import pythoncom
+    except ImportError as e:
+        _win32_import_failed(e)
+        return
+    try:
+        pythoncom.CoInitialize()
+    except:
+        return
+    _thread_local.shell = _create_shell()
+
+def get_shell():
+    """Return the WScript.Shell object for the calling thread"""
+    global shell, _shell_created
+    if threading.current_thread() is threading.main_thread():
+        if not _shell_created:
+            shell = _create_shell()
+            _shell_created = True
+        return shell
+    if not hasattr(_thread_local, 'shell'):
+        _init_com_thread()
+    return _thread_local.shell
 
 # Track launched shortcuts to allow proper duplicate handling
 launched_shortcuts = set()
@@ -188,9 +606,24 @@ launched_shortcuts = set()
 # Global configuration for multiple instances
 allow_multiple_default = True
 restricted_programs = set()
+restricted_pattern = None  # restricted_programs as one compiled regex (see compile_name_pattern)
+
+# Filename markers ("--" or " - ") that always allow another instance
+DUPLICATE_MARKER_RE = re.compile(r'--| - ')
+
+# How to wait for a launched program (--wait-mode)
+WAIT_MODES = ('verify', 'min', 'none')
+
+def compile_name_pattern(names):
+    """Compile program names into one regex alternation so a single search checks them all"""
+    if not names:
+        return None
+    return re.compile('|'.join(re.escape(name) for name in sorted(names)))
 
 def parse_arguments():
     """Parse command line arguments"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Desktop Startup Script - Launch shortcuts and executables with duplicate control',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -223,6 +656,9 @@ Examples:
   %(prog)s --restrict-all --allow-multiple notepad cmd
     # Restrict all except notepad and cmd
     
+  %(prog)s -nw dropbox -nw onedrive
+    # Don't wait for tray programs that never show a window
+    
   %(prog)s "C:\\Custom\\Startup\\Folder"
     # Use a custom startup folder
         """
@@ -268,10 +704,27 @@ Examples:
     parser.add_argument('--wait-time', type=int, default=5,
                         help='Maximum time to wait for program to start (default: 5 seconds)')
     
+    parser.add_argument('--max-concurrent-launches', type=int, default=1, metavar='N',
+                        help='Maximum number of files launched and waited on at the same time '
+                             '(default: 1, launch strictly one after another). With more than 1, '
+                             '--delay only separates launches within each slot and output from '
+                             'different files may interleave')
+    
+    # Start-up verification
+    parser.add_argument('--wait-mode', choices=WAIT_MODES, default='verify',
+                        help='How to wait after launching: verify = until the program is detected '
+                             '(up to --wait-time), min = a short fixed pause, none = move on '
+                             'immediately without --delay (default: verify)')
+    
+    parser.add_argument('-nw', '--no-wait', action='append',
+                        dest='no_wait_list', metavar='PROGRAM',
+                        help='Launch specific program without waiting for it, e.g. tray programs '
+                             'with no window (can be used multiple times)')
+    
     args = parser.parse_args()
     
     # Process the arguments into global configuration
-    global allow_multiple_default, restricted_programs
+    global allow_multiple_default, restricted_programs, restricted_pattern
     
     if args.restrict_all:
         allow_multiple_default = False
@@ -285,6 +738,7 @@ Examples:
         # If not restrict_all, restrict_list specifies what to restrict
         if args.restrict_list:
             restricted_programs = set(prog.lower() for prog in args.restrict_list)
+            restricted_pattern = compile_name_pattern(restricted_programs)
     
     # Handle the combination of --restrict-all and --allow-multiple
     if args.restrict_all and args.allow_list:
@@ -293,6 +747,11 @@ Examples:
         args.allowed_programs = set(prog.lower() for prog in args.allow_list)
     else:
         args.allowed_programs = None
+    args.allowed_pattern = compile_name_pattern(args.allowed_programs)
+    
+    # Programs launched fire-and-forget, matched the same way as the restrict list
+    args.no_wait_programs = set(prog.lower() for prog in args.no_wait_list) if args.no_wait_list else None
+    args.no_wait_pattern = compile_name_pattern(args.no_wait_programs)
     
     # Handle native file inclusion
     # Simple: Default to True, only False if --no-native is used
@@ -307,33 +766,33 @@ Examples:
 
     return args
 
+def _ext_is_executable(name):
+    """Check if a file name has a native executable extension (no filesystem access)"""
+    # Strip any trailing whitespace, normalize to lowercase and match the suffix
+    return name.rstrip().lower().endswith(_EXEC_SUFFIXES)
+
 def is_native_executable(filename):
     """Check if a file is a native executable"""
     # Make sure we're dealing with a file, not a directory
     if os.path.isdir(filename):
         return False
     
-    # Get extension and normalize to lowercase
-    ext = os.path.splitext(filename)[1].lower()
-    
-    # Strip any whitespace that might be present
-    ext = ext.strip()
-    
-    return ext in EXECUTABLE_EXTENSIONS
+    return _ext_is_executable(filename)
 
-def get_target_info(filename, args):
-    """Get target information for either .lnk or native files"""
+@functools.lru_cache(maxsize=None)
+def get_target_info(filename):
+    """Get target information for either .lnk or native files (memoized per filename)"""
     basename = os.path.splitext(filename)[0].lower()
     
     if filename.endswith('.lnk'):
-        if not shell:
+        thread_shell = get_shell()
+        if not thread_shell:
             # Can't parse shortcuts without win32com
-            if args.verbose:
-                print(f"  Warning: Cannot parse shortcut '{filename}' - pywin32 not installed")
+            log.debug("  Warning: Cannot parse shortcut '%s' - pywin32 not installed", filename)
             return None, None, None
         
         try:
-            shortcut_obj = shell.CreateShortCut(filename)
+            shortcut_obj = thread_shell.CreateShortCut(filename)
             targetname = os.path.basename(shortcut_obj.Targetpath.lower())
             targetname_noext = os.path.splitext(targetname)[0]
             arguments = shortcut_obj.Arguments
@@ -353,6 +812,37 @@ def get_target_info(filename, args):
     # Unknown file type (shouldn't happen with current filtering)
     return None, None, None
 
+def resolve_targets(files, max_workers=8):
+    """Run get_target_info for every file, parsing shortcuts on a thread pool"""
+    targets = {}
+    
+    # Each shortcut costs a WScript.Shell round-trip, so spread them over worker
+    # threads (get_shell sets up COM on each worker's first call)
+    shortcuts = [f for f in files if f.endswith('.lnk')]
+    if WIN32_AVAILABLE and len(shortcuts) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(shortcuts))) as executor:
+            results = executor.map(get_target_info, shortcuts)
+            targets.update(zip(shortcuts, results))
+    
+    # Native files are a cheap string check; do them (and any leftovers) inline
+    for f in files:
+        if f not in targets:
+            targets[f] = get_target_info(f)
+    
+    return targets
+
+def matches_program(pattern, filename, shortcut_targetname):
+    """Check a compiled program-name pattern against a file's target and shortcut names"""
+    # Compare the base names, without extension
+    target_base = (shortcut_targetname or '').lower()
+    if target_base.endswith('.exe'):
+        target_base = target_base[:-4]
+    
+    shortcut_base = os.path.splitext(filename)[0].lower()
+    
+    return bool(pattern.search(target_base) or pattern.search(shortcut_base))
+
 def should_allow_multiple(filename, shortcut_targetname, args):
     """Determine if multiple instances should be allowed for this program"""
     
@@ -361,181 +851,597 @@ def should_allow_multiple(filename, shortcut_targetname, args):
         # Default to the global setting when we can't parse the file
         return allow_multiple_default
     
-    # Extract the base name without extension
-    target_base = shortcut_targetname.lower()
-    if target_base.endswith('.exe'):
-        target_base = target_base[:-4]
-    
-    shortcut_base = os.path.splitext(filename)[0].lower()
-    
-    # Check special markers in filename
-    if '--' in filename or ' - ' in filename:
+    # Check special markers in filename (before doing any other string work)
+    if DUPLICATE_MARKER_RE.search(filename):
         return True
     
+    # If restrict_all mode without allow_list, no names need to be compared
+    if args.restrict_all and not args.allowed_programs:
+        return False
+    
     # If restrict_all mode with allow_list
     if args.restrict_all and args.allowed_programs:
         # Check if this program is in the allowed list
-        for allowed in args.allowed_programs:
-            if allowed in target_base or allowed in shortcut_base:
-                return True
-        return False
-    
-    # If restrict_all mode without allow_list
-    if args.restrict_all:
-        return False
+        return matches_program(args.allowed_pattern, filename, shortcut_targetname)
     
     # Default mode: check if program is in restricted list
-    for restricted in restricted_programs:
-        if restricted in target_base or restricted in shortcut_base:
-            return False
+    if restricted_pattern and matches_program(restricted_pattern, filename, shortcut_targetname):
+        return False
     
     # Default behavior
     return allow_multiple_default
 
-def IsFileAlreadyRunning(filename, args):
-    """Check if a file's target is already running (works for both .lnk and native files)"""
-    basename = os.path.splitext(filename)[0].lower()
-    
-    # Special handling for already launched files in this session
-    if filename.lower() in launched_shortcuts:
-        return True
-    
+def get_wait_mode(filename, shortcut_targetname, args):
+    """Determine how to wait for this program after launching it"""
+    if args.no_wait_pattern and matches_program(args.no_wait_pattern, filename, shortcut_targetname):
+        return 'none'
+    return args.wait_mode
+
+# pyahocorasick is optional; when installed it matches all file names against the
+# window titles in a single pass (pip install pyahocorasick)
+_ahocorasick = None
+_ahocorasick_checked = False
+
+def _get_ahocorasick():
+    """Return the ahocorasick module, or None if it isn't installed"""
+    global _ahocorasick, _ahocorasick_checked
+    if not _ahocorasick_checked:
+        try:
+            import ahocorasick
+            _ahocorasick = ahocorasick
+        except ImportError:
+            _ahocorasick = None
+        _ahocorasick_checked = True
+    return _ahocorasick
+
+class WindowSnapshot:
+    """Active-desktop windows stored as parallel tuples, one entry per window"""
+    def __init__(self, windows):
+        active = [window for window in windows if window.is_on_active_desktop]
+        self._windows = active
+        self.hwnds = tuple(window.id for window in active)
+        self.titles = tuple(window.text for window in active)
+        # Lowercase once here instead of once per file being checked
+        self.titles_lower = tuple(title.lower() for title in self.titles)
+        self._process_names = None
+        self._procs_lower = None
+        self._title_matches = {}  # pattern -> index of first title containing it, or None
+    
+    def __len__(self):
+        return len(self.hwnds)
+    
+    @property
+    def process_names(self):
+        """Process names, resolved on first use since title-only checks don't need them"""
+        if self._process_names is None:
+            self._process_names = tuple(str(window.process_name) for window in self._windows)
+        return self._process_names
+    
+    @property
+    def procs_lower(self):
+        """Lowercased process names with the .exe extension removed"""
+        if self._procs_lower is None:
+            procs_lower = []
+            for process_name in self.process_names:
+                process_name = process_name.lower()
+                if process_name.endswith('.exe'):
+                    process_name = process_name[:-4]
+                procs_lower.append(process_name)
+            self._procs_lower = tuple(procs_lower)
+        return self._procs_lower
+
+    def match_titles(self, patterns):
+        """Find the first window title containing each (lowercase) pattern in one pass"""
+        pending = {p for p in patterns if p not in self._title_matches}
+        if not pending:
+            return
+        
+        # An empty pattern matches any title
+        if '' in pending:
+            pending.discard('')
+            self._title_matches[''] = 0 if self.titles_lower else None
+        if not pending:
+            return
+        
+        found = {}
+        ahocorasick = _get_ahocorasick()
+        if ahocorasick is not None:
+            # Stream every title through one automaton built from all the patterns
+            automaton = ahocorasick.Automaton()
+            for pattern in pending:
+                automaton.add_word(pattern, pattern)
+            automaton.make_automaton()
+            
+            for i, title in enumerate(self.titles_lower):
+                for _, pattern in automaton.iter(title):
+                    if pattern not in found:
+                        found[pattern] = i
+                if len(found) == len(pending):
+                    break
+        else:
+            # Join the titles once (NUL can't appear in a title or file name) and
+            # let str.find scan them in C, then map each hit back to its title
+            joined = '\0'.join(self.titles_lower)
+            starts = []
+            offset = 0
+            for title in self.titles_lower:
+                starts.append(offset)
+                offset += len(title) + 1
+            
+            for pattern in pending:
+                pos = joined.find(pattern)
+                if pos >= 0:
+                    found[pattern] = bisect.bisect_right(starts, pos) - 1
+        
+        for pattern in pending:
+            self._title_matches[pattern] = found.get(pattern)
+    
+    def find_title(self, pattern):
+        """Index of the first window title containing pattern (lowercase), or None"""
+        if pattern not in self._title_matches:
+            self.match_titles((pattern,))
+        return self._title_matches[pattern]
+
+def get_desktop_snapshot():
+    """Enumerate the windows on the current desktop once so callers can share the result"""
     # Try to use virtual desktop detection
     try:
         desktop = SimpleDesktop()
     except:
-        if args.verbose:
-            print("Using fallback process detection...")
+        log.debug("Using fallback process detection...")
         desktop = FallbackDesktop()
     
-    # Get target information
-    targetname, targetname_noext, arguments = get_target_info(filename, args)
+    return WindowSnapshot(desktop)
+
+def find_running_process(procs_lower, basename, targetname_noext, arguments):
+    """Index of the first process name (lowercased, .exe removed) that belongs to a file, or None"""
+    if basename in arguments and procs_lower:
+        # Doesn't depend on the process, so it matches the first one
+        return 0
+    return next((i for i, process_name in enumerate(procs_lower)
+                 if basename in process_name or targetname_noext in process_name), None)
+
+def IsFileAlreadyRunning(filename, args, snapshot=None, target_info=None):
+    """Check if a file's target is already running (works for both .lnk and native files)"""
+    # Derive everything we need from the filename once
+    filename_lower = filename.lower()
+    basename = os.path.splitext(filename_lower)[0]
+    is_ahk = filename_lower.endswith('.ahk')
+    
+    # Special handling for already launched files in this session
+    if filename_lower in launched_shortcuts:
+        return True
+    
+    # Get target information, unless the caller already resolved it
+    if target_info is None:
+        target_info = get_target_info(filename)
+    targetname, targetname_noext, arguments = target_info
     
     # If we couldn't parse the file, we can't check if it's running
     if targetname is None:
-        if args.verbose:
-            print(f"  Cannot check if '{filename}' is running - unable to parse file")
+        log.debug("  Cannot check if '%s' is running - unable to parse file", filename)
         return False
     
     # Check if multiple instances are allowed for this program
     allow_multiple = should_allow_multiple(filename, targetname, args)
     
-    if args.verbose:
-        print(f"  Multiple instances allowed: {allow_multiple}")
+    log.debug("  Multiple instances allowed: %s", allow_multiple)
+    
+    # Use the caller's snapshot if given, otherwise enumerate a fresh one
+    if snapshot is None:
+        snapshot = get_desktop_snapshot()
     
     # If multiple processes are allowed, check for exact name match
     if allow_multiple:
-        # Only check if this specific variant is running
-        for window in desktop:
-            if window.is_on_active_desktop:
-                window_title = window.text.lower()
-                # Check if the window title contains the file's unique identifier
-                if basename in window_title:
-                    if args.verbose:
-                        print(f"  Found matching window for {basename}: {window.text}")
-                    return True
+        # Only check if this specific variant is running, i.e. a window title
+        # contains the file's unique identifier
+        match = snapshot.find_title(basename)
+        if match is not None:
+            log.debug("  Found matching window for %s: %s", basename, snapshot.titles[match])
+            return True
+        return False
+    
+    # For AHK files, look for the script name in a window title. AutoHotkey
+    # typically includes the script name in its window title, and some scripts
+    # create their own windows. (The filename contains basename, so a title
+    # match on basename covers both.) We're conservative and don't match
+    # generic AutoHotkey processes without the script name.
+    if is_ahk:
+        match = snapshot.find_title(basename)
+        if match is not None:
+            if log.isEnabledFor(logging.DEBUG):
+                if 'autohotkey' in snapshot.procs_lower[match]:
+                    log.debug("  Found matching AHK script: %s", snapshot.titles[match])
+                else:
+                    log.debug("  Found window potentially from AHK script: %s", snapshot.titles[match])
+            return True
         return False
     
     # Standard check for single-instance programs
-    for window in desktop:
-        if window.is_on_active_desktop:
-            process_name = str(window.process_name).lower()
-            
-            # Remove .exe extension for comparison
-            if process_name.endswith('.exe'):
-                process_name = process_name[:-4]
-            
-            # For AHK files, check for AutoHotkey.exe
-            if filename.endswith('.ahk'):
-                if 'autohotkey' in process_name:
-                    # Check window title for script name
-                    # AutoHotkey typically includes the script name in the window title
-                    window_title = window.text.lower()
-                    
-                    # Check if this specific script is running
-                    # Look for the script filename in the window title
-                    if basename in window_title or filename.lower() in window_title:
-                        if args.verbose:
-                            print(f"  Found matching AHK script: {window.text}")
-                        return True
-                    
-                    # Also check if the process command line contains our script
-                    # (This would require more advanced process inspection)
-                    # For now, we'll be conservative and not match generic AutoHotkey processes
-                    
-                # Also check if there's a window with the script name
-                # (Some AHK scripts create their own windows)
-                elif basename in window.text.lower():
-                    if args.verbose:
-                        print(f"  Found window potentially from AHK script: {window.text}")
-                    return True
-            else:
-                if (basename in process_name or 
-                   basename in arguments or
-                   targetname_noext in process_name):
-                    if args.verbose:
-                        print(f"  Found matching process: {window.process_name}")
-                    return True
+    match = find_running_process(snapshot.procs_lower, basename, targetname_noext, arguments)
+    if match is not None:
+        log.debug("  Found matching process: %s", snapshot.process_names[match])
+        return True
     
     return False
 
+# Process launch/wait constants
+CREATE_SUSPENDED = 0x00000004
+SEE_MASK_NOCLOSEPROCESS = 0x00000040
+SEE_MASK_FLAG_NO_UI = 0x00000400
+SW_SHOWNORMAL = 1
+COINIT_APARTMENTTHREADED = 0x2
+COINIT_DISABLE_OLE1DDE = 0x4
+WAIT_TIMEOUT = 0x00000102
+WAIT_FAILED = 0xFFFFFFFF
+
+# Job objects: lets us see the processes a launcher stub starts on our behalf
+JobObjectBasicLimitInformation = 2
+JobObjectAssociateCompletionPortInformation = 7
+JOB_OBJECT_LIMIT_BREAKAWAY_OK = 0x00000800
+JOB_OBJECT_MSG_ACTIVE_PROCESS_ZERO = 4
+JOB_OBJECT_MSG_NEW_PROCESS = 6
+
+class JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+    _fields_ = [
+        ('PerProcessUserTimeLimit', wintypes.LARGE_INTEGER),
+        ('PerJobUserTimeLimit', wintypes.LARGE_INTEGER),
+        ('LimitFlags', wintypes.DWORD),
+        ('MinimumWorkingSetSize', ctypes.c_size_t),
+        ('MaximumWorkingSetSize', ctypes.c_size_t),
+        ('ActiveProcessLimit', wintypes.DWORD),
+        ('Affinity', ctypes.c_size_t),
+        ('PriorityClass', wintypes.DWORD),
+        ('SchedulingClass', wintypes.DWORD),
+    ]
+
+class JOBOBJECT_ASSOCIATE_COMPLETION_PORT(ctypes.Structure):
+    _fields_ = [
+        ('CompletionKey', ctypes.c_void_p),
+        ('CompletionPort', wintypes.HANDLE),
+    ]
+
+class SHELLEXECUTEINFOW(ctypes.Structure):
+    _fields_ = [
+        ('cbSize', wintypes.DWORD),
+        ('fMask', wintypes.ULONG),
+        ('hwnd', wintypes.HWND),
+        ('lpVerb', wintypes.LPCWSTR),
+        ('lpFile', wintypes.LPCWSTR),
+        ('lpParameters', wintypes.LPCWSTR),
+        ('lpDirectory', wintypes.LPCWSTR),
+        ('nShow', ctypes.c_int),
+        ('hInstApp', wintypes.HINSTANCE),
+        ('lpIDList', ctypes.c_void_p),
+        ('lpClass', wintypes.LPCWSTR),
+        ('hkeyClass', wintypes.HKEY),
+        ('dwHotKey', wintypes.DWORD),
+        ('hIconOrMonitor', wintypes.HANDLE),
+        ('hProcess', wintypes.HANDLE),
+    ]
+
+class LaunchApi:
+    """kernel32/user32/shell32 entry points used to launch programs and wait for them"""
+    
+    def __init__(self):
+        self.kernel32 = ctypes.WinDLL("kernel32")
+        self.user32 = ctypes.WinDLL("user32")
+        self.shell32 = ctypes.WinDLL("shell32")
+        self.ole32 = ctypes.WinDLL("ole32")
+        self.ntdll = ctypes.WinDLL("ntdll")
+        
+        self.ole32.CoInitializeEx.argtypes = [ctypes.c_void_p, wintypes.DWORD]
+        self.ole32.CoInitializeEx.restype = ctypes.c_long
+        self.ntdll.NtResumeProcess.argtypes = [wintypes.HANDLE]
+        self.ntdll.NtResumeProcess.restype = ctypes.c_long
+        self.kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        self.kernel32.OpenProcess.restype = wintypes.HANDLE
+        self.kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self.kernel32.CloseHandle.restype = wintypes.BOOL
+        self.kernel32.GetProcessId.argtypes = [wintypes.HANDLE]
+        self.kernel32.GetProcessId.restype = wintypes.DWORD
+        self.user32.WaitForInputIdle.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        self.user32.WaitForInputIdle.restype = wintypes.DWORD
+        self.shell32.ShellExecuteExW.argtypes = [ctypes.POINTER(SHELLEXECUTEINFOW)]
+        self.shell32.ShellExecuteExW.restype = wintypes.BOOL
+        self.shell32.IsUserAnAdmin.restype = wintypes.BOOL
+        
+        # Whether this script runs elevated; programs we start ourselves inherit that
+        self.elevated = bool(self.shell32.IsUserAnAdmin())
+        
+        self.kernel32.CreateJobObjectW.argtypes = [ctypes.c_void_p, wintypes.LPCWSTR]
+        self.kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+        self.kernel32.SetInformationJobObject.argtypes = [wintypes.HANDLE, ctypes.c_int,
+                                                          ctypes.c_void_p, wintypes.DWORD]
+        self.kernel32.SetInformationJobObject.restype = wintypes.BOOL
+        self.kernel32.AssignProcessToJobObject.argtypes = [wintypes.HANDLE, wintypes.HANDLE]
+        self.kernel32.AssignProcessToJobObject.restype = wintypes.BOOL
+        self.kernel32.CreateIoCompletionPort.argtypes = [wintypes.HANDLE, wintypes.HANDLE,
+                                                         ctypes.c_size_t, wintypes.DWORD]
+        self.kernel32.CreateIoCompletionPort.restype = wintypes.HANDLE
+        self.kernel32.GetQueuedCompletionStatus.argtypes = [
+            wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD), ctypes.POINTER(ctypes.c_size_t),
+            ctypes.POINTER(ctypes.c_void_p), wintypes.DWORD]
+        self.kernel32.GetQueuedCompletionStatus.restype = wintypes.BOOL
+
+_launch_api = None
+
+def get_launch_api():
+    """Return the shared LaunchApi, or None where the Win32 APIs aren't available"""
+    global _launch_api
+    if _launch_api is None:
+        try:
+            _launch_api = LaunchApi()
+        except (AttributeError, OSError):
+            _launch_api = False
+    return _launch_api or None
+
+class LaunchedProcess:
+    """A started program, with a process handle to wait on when one is available"""
+    __slots__ = ('pid', 'handle', 'job', 'port')
+    
+    def __init__(self, pid=None, handle=None):
+        self.pid = pid
+        self.handle = handle
+        self.job = None   # Job object the process (and its children) belong to
+        self.port = None  # Completion port receiving the job's notifications
+    
+    def attach_job(self):
+        """Put the process in a job of its own so we hear about any processes it starts
+        
+        A process can't leave a job again, so the program a launcher stub starts
+        stays in this job for life; only use it for launcher stubs.
+        """
+        api = get_launch_api()
+        if not api or not self.pid:
+            return
+        kernel32 = api.kernel32
+        
+        job = kernel32.CreateJobObjectW(None, None)
+        if not job:
+            return
+        port = kernel32.CreateIoCompletionPort(INVALID_HANDLE_VALUE, None, 0, 1)
+        
+        # Children may still leave the job if they ask to, and closing our
+        # job handle never kills anything
+        limits = JOBOBJECT_BASIC_LIMIT_INFORMATION()
+        limits.LimitFlags = JOB_OBJECT_LIMIT_BREAKAWAY_OK
+        assoc = JOBOBJECT_ASSOCIATE_COMPLETION_PORT(None, port)
+        
+        # Assigning needs more access than the waitable handle was opened with
+        process = kernel32.OpenProcess(PROCESS_SET_QUOTA | PROCESS_TERMINATE, False, self.pid)
+        ok = (port and process and
+              kernel32.SetInformationJobObject(job, JobObjectBasicLimitInformation,
+                                               ctypes.byref(limits), ctypes.sizeof(limits)) and
+              kernel32.SetInformationJobObject(job, JobObjectAssociateCompletionPortInformation,
+                                               ctypes.byref(assoc), ctypes.sizeof(assoc)) and
+              kernel32.AssignProcessToJobObject(job, process))
+        if process:
+            kernel32.CloseHandle(process)
+        if ok:
+            self.job, self.port = job, port
+        else:
+            # Already in a job that doesn't allow nesting or breakaway; just go without
+            log.debug("  Could not track child processes of pid %s", self.pid)
+            kernel32.CloseHandle(job)
+            if port:
+                kernel32.CloseHandle(port)
+    
+    def next_job_event(self, timeout):
+        """Wait up to timeout seconds for a job notification, returning (message, pid) or None"""
+        api = get_launch_api()
+        message = wintypes.DWORD()
+        key = ctypes.c_size_t()
+        pid = ctypes.c_void_p()  # The "overlapped" pointer carries the pid for job messages
+        if not api.kernel32.GetQueuedCompletionStatus(self.port, ctypes.byref(message),
+                                                      ctypes.byref(key), ctypes.byref(pid),
+                                                      max(0, int(timeout * 1000))):
+            return None
+        return message.value, pid.value
+    
+    def close(self):
+        """Release the process and job handles (the processes themselves keep running)"""
+        api = get_launch_api()
+        if api:
+            for handle in (self.handle, self.job, self.port):
+                if handle:
+                    api.kernel32.CloseHandle(handle)
+        self.handle = self.job = self.port = None
+
+def _spawn(arguments, track_children=False):
+    """Start a command with Popen and open a waitable handle to the new process
+    
+    With track_children (for launcher stubs like "cmd /c start"), the process is
+    put in a job before it runs so the programs it starts can be waited on.
+    """
+    api = get_launch_api()
+    track_children = track_children and api is not None
+    proc = subprocess.Popen(arguments, shell=False, stdin=None,
+                          stdout=None, stderr=None, close_fds=True,
+                          creationflags=CREATE_SUSPENDED if track_children else 0)
+    
+    handle = None
+    if api:
+        # Popen still holds its own handle here, so the pid can't have been reused
+        handle = (api.kernel32.OpenProcess(SYNCHRONIZE | PROCESS_QUERY_INFORMATION, False, proc.pid) or
+                  api.kernel32.OpenProcess(SYNCHRONIZE | PROCESS_QUERY_LIMITED_INFORMATION, False, proc.pid))
+    launched = LaunchedProcess(proc.pid, handle or None)
+    
+    if track_children:
+        # Still suspended, so it can't have started anything outside the job yet
+        try:
+            launched.attach_job()
+        finally:
+            _resume_process(api, proc)
+    return launched
+
+def _resume_process(api, proc):
+    """Let a process created with CREATE_SUSPENDED run"""
+    process = api.kernel32.OpenProcess(PROCESS_SUSPEND_RESUME, False, proc.pid)
+    try:
+        if process and api.ntdll.NtResumeProcess(process) == 0:
+            return
+    finally:
+        if process:
+            api.kernel32.CloseHandle(process)
+    # Don't leave it hanging around suspended
+    proc.kill()
+    raise OSError(f"could not resume process {proc.pid}")
+
+def _shell_execute(filename):
+    """Open a file through ShellExecuteEx, returning a LaunchedProcess or None on failure"""
+    api = get_launch_api()
+    if not api:
+        return None
+    
+    # Launches run on worker threads; ShellExecuteEx may hand the file to shell
+    # extensions, which need COM set up on the calling thread
+    if not getattr(_thread_local, 'launch_com', False):
+        api.ole32.CoInitializeEx(None, COINIT_APARTMENTTHREADED | COINIT_DISABLE_OLE1DDE)
+        _thread_local.launch_com = True
+    
+    info = SHELLEXECUTEINFOW()
+    info.cbSize = ctypes.sizeof(SHELLEXECUTEINFOW)
+    info.fMask = SEE_MASK_NOCLOSEPROCESS | SEE_MASK_FLAG_NO_UI
+    info.lpVerb = "open"
+    info.lpFile = os.path.abspath(filename)
+    info.lpDirectory = os.getcwd()
+    info.nShow = SW_SHOWNORMAL
+    if not api.shell32.ShellExecuteExW(ctypes.byref(info)):
+        return None
+    
+    # hProcess is NULL when the shell handed the request to an existing process
+    handle = info.hProcess or None
+    pid = api.kernel32.GetProcessId(handle) if handle else None
+    return LaunchedProcess(pid, handle)
+
+def wait_for_input_idle(launched, timeout):
+    """Block until a launched program is ready for input, or timeout seconds pass
+    
+    Returns True when it's ready, False on timeout, and None when there's nothing
+    to wait on (no handle, a console program, or no Win32 API).
+    """
+    api = get_launch_api()
+    if not api or not launched.handle:
+        return None
+    
+    deadline = time.monotonic() + timeout
+    result = api.user32.WaitForInputIdle(launched.handle, int(timeout * 1000))
+    if result == 0:
+        return True
+    if result == WAIT_TIMEOUT:
+        return False
+    
+    # WAIT_FAILED: a console program or a process without a message queue.
+    # For launcher stubs started in a job (cmd /c start) wait on whatever
+    # programs it starts instead.
+    if result != WAIT_FAILED or not launched.port:
+        return None
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        event = launched.next_job_event(remaining)
+        if event is None:
+            return False  # Timed out with nothing ready for input
+        message, pid = event
+        if message == JOB_OBJECT_MSG_ACTIVE_PROCESS_ZERO:
+            return None  # Everything exited, e.g. handed off to an existing instance
+        if message != JOB_OBJECT_MSG_NEW_PROCESS or pid == launched.pid:
+            continue
+        
+        child = api.kernel32.OpenProcess(SYNCHRONIZE | PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not child:
+            continue  # Already gone
+        try:
+            result = api.user32.WaitForInputIdle(
+                child, max(0, int((deadline - time.monotonic()) * 1000)))
+        finally:
+            api.kernel32.CloseHandle(child)
+        if result == 0:
+            log.debug("  Child process %s is ready for input", pid)
+            return True
+        if result == WAIT_TIMEOUT:
+            return False
+        # Another console process; keep waiting for the next one
+
+# AutoHotkey interpreters to look for, in order of preference
+AHK_CANDIDATES = [
+    'AutoHotkey.exe',  # In PATH
+    'AutoHotkeyU64.exe',  # v1 64-bit
+    'AutoHotkeyU32.exe',  # v1 32-bit
+    'AutoHotkey32.exe',  # v2 32-bit
+    'AutoHotkey64.exe',  # v2 64-bit
+    r'C:\Program Files\AutoHotkey\AutoHotkey.exe',
+    r'C:\Program Files\AutoHotkey\v2\AutoHotkey.exe',
+    r'C:\Program Files\AutoHotkey\v2\AutoHotkey64.exe',
+    r'C:\Program Files\AutoHotkey\v1.1\AutoHotkeyU64.exe',
+    r'C:\Program Files (x86)\AutoHotkey\AutoHotkey.exe',
+]
+
+# Result of the AutoHotkey search, shared by every .ahk launch in this run
+_ahk_exe_cache = None
+_ahk_exe_searched = False
+
+def find_autohotkey():
+    """Find an AutoHotkey executable by probing the filesystem (cached after the first call)"""
+    global _ahk_exe_cache, _ahk_exe_searched
+    if not _ahk_exe_searched:
+        for candidate in AHK_CANDIDATES:
+            found = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+            if found:
+                _ahk_exe_cache = found
+                break
+        _ahk_exe_searched = True
+    return _ahk_exe_cache
+
 def launch_file(filename, args):
-    """Launch either a .lnk shortcut or a native executable"""
+    """Launch either a .lnk shortcut or a native executable
+    
+    Returns a LaunchedProcess (truthy) on success, or None if nothing was launched.
+    """
+    track_children = False
     if filename.endswith('.lnk'):
-        # Launch shortcut via explorer
+        # Open the shortcut through the shell so we get a handle to the target
+        # process. That runs it with our own token though, so when elevated let
+        # explorer start it at the user's normal privilege level instead.
+        api = get_launch_api()
+        if api and not api.elevated:
+            launched = _shell_execute(filename)
+            if launched:
+                return launched
+        
+        # Otherwise launch shortcut via explorer
         arguments = ['explorer.exe', filename]
     elif is_native_executable(filename):
         # Launch native file directly
         ext = os.path.splitext(filename)[1].lower()
         
         if ext == '.ahk':
-            # AutoHotkey files - try multiple approaches
-            # First, try to find AutoHotkey in common locations
-            ahk_paths = [
-                'AutoHotkey.exe',  # In PATH
-                'AutoHotkeyU64.exe',  # v1 64-bit
-                'AutoHotkeyU32.exe',  # v1 32-bit
-                'AutoHotkey32.exe',  # v2 32-bit
-                'AutoHotkey64.exe',  # v2 64-bit
-                r'C:\Program Files\AutoHotkey\AutoHotkey.exe',
-                r'C:\Program Files\AutoHotkey\v2\AutoHotkey.exe',
-                r'C:\Program Files\AutoHotkey\v2\AutoHotkey64.exe',
-                r'C:\Program Files\AutoHotkey\v1.1\AutoHotkeyU64.exe',
-                r'C:\Program Files (x86)\AutoHotkey\AutoHotkey.exe',
-            ]
-            
-            # Try each potential AutoHotkey executable
-            ahk_found = False
-            for ahk_exe in ahk_paths:
+            # AutoHotkey files - use the interpreter directly if we can find it
+            ahk_exe = find_autohotkey()
+            if ahk_exe:
                 try:
-                    # Test if this AutoHotkey executable exists/works
-                    arguments = [ahk_exe, filename]
-                    proc = subprocess.Popen(arguments, shell=False, stdin=None,
-                                          stdout=None, stderr=None, close_fds=True)
-                    ahk_found = True
-                    if args.verbose:
-                        print(f"  Using AutoHotkey: {ahk_exe}")
-                    return True
+                    launched = _spawn([ahk_exe, filename])
+                    log.debug("  Using AutoHotkey: %s", ahk_exe)
+                    return launched
                 except (FileNotFoundError, OSError):
-                    continue
+                    pass
             
-            if not ahk_found:
-                # Last resort: try to launch .ahk directly (relies on Windows file association)
-                try:
-                    arguments = ['cmd.exe', '/c', 'start', '""', filename]
-                    proc = subprocess.Popen(arguments, shell=False, stdin=None,
-                                          stdout=None, stderr=None, close_fds=True)
-                    if args.verbose:
-                        print(f"  Launching via Windows file association")
-                    return True
-                except Exception as e:
-                    print(f"  ✗ Error: AutoHotkey not found. Please install AutoHotkey or check PATH")
-                    print(f"     Tried locations: {', '.join(ahk_paths[:5])}...")
-                    return False
+            # Last resort: try to launch .ahk directly (relies on Windows file association)
+            try:
+                launched = _spawn(['cmd.exe', '/c', 'start', '""', filename], track_children=True)
+                log.debug("  Launching via Windows file association")
+                return launched
+            except Exception as e:
+                print(f"  ✗ Error: AutoHotkey not found. Please install AutoHotkey or check PATH")
+                print(f"     Tried locations: {', '.join(AHK_CANDIDATES[:5])}...")
+                return None
             
         elif ext in {'.bat', '.cmd'}:
-            # Batch files - run via cmd
+            # Batch files - run via cmd (a launcher stub, so follow its children)
             arguments = ['cmd.exe', '/c', 'start', '""', filename]
+            track_children = True
         elif ext == '.ps1':
             # PowerShell scripts
             arguments = ['powershell.exe', '-ExecutionPolicy', 'Bypass', '-File', filename]
@@ -547,20 +1453,268 @@ def launch_file(filename, args):
             arguments = [filename]
     else:
         # Unknown file type
-        return False
+        return None
     
     try:
-        proc = subprocess.Popen(arguments, shell=False, stdin=None, 
-                              stdout=None, stderr=None, close_fds=True)
-        return True
+        return _spawn(arguments, track_children)
     except Exception as e:
         print(f"  ✗ Error launching {filename}: {e}")
-        return False
+        return None
+
+# Polling fallback timing (seconds)
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 1.0
+MULTI_INSTANCE_WAIT = 0.3  # How long to give a multi-instance program before moving on
+MIN_WAIT = 0.2  # Fixed pause for --wait-mode min
+PROCESS_SNAPSHOT_MAX_AGE = 0.5  # Longest a shared process snapshot is reused
+
+_progress_width = 0  # Length of the progress line currently on screen (0 = none)
+
+def show_progress(text):
+    """Overwrite the current console line with a progress message (TTY only)"""
+    global _progress_width
+    if not sys.stdout.isatty():
+        return  # Progress lines would just clutter a log file or pipe
+    sys.stdout.write('\r' + text.ljust(_progress_width))
+    sys.stdout.flush()
+    _progress_width = len(text)
+
+def clear_progress():
+    """Blank out any progress line so the next print starts on a clean line"""
+    global _progress_width
+    if _progress_width:
+        sys.stdout.write('\r' + ' ' * _progress_width + '\r')
+        _progress_width = 0
+
+class ProcessWatcher:
+    """Running process names shared by every waiting file, so N waiters cost one snapshot"""
+    
+    def __init__(self, max_age=PROCESS_SNAPSHOT_MAX_AGE):
+        self.max_age = max_age
+        self._procs_lower = None
+        self._time = 0.0
+        self._lock = asyncio.Lock()  # Only one task refreshes; the rest reuse its result
+    
+    async def running_names(self, max_age=None):
+        """Running process names (lowercased, .exe removed) from a snapshot at most max_age seconds old"""
+        max_age = self.max_age if max_age is None else min(max_age, self.max_age)
+        async with self._lock:
+            if self._procs_lower is None or time.monotonic() - self._time >= max_age:
+                loop = asyncio.get_event_loop()
+                names = await loop.run_in_executor(None, snapshot_process_names)
+                # Normalize once here rather than in every waiter's check
+                procs_lower = set()
+                for name in names.values():
+                    if name:
+                        name = name.lower()
+                        procs_lower.add(name[:-4] if name.endswith('.exe') else name)
+                self._procs_lower = tuple(procs_lower)
+                self._time = time.monotonic()
+            return self._procs_lower
+
+class LaunchState:
+    """State shared by the per-file launch tasks"""
+    def __init__(self, args, files, target_cache):
+        self.args = args
+        self.target_cache = target_cache
+        self.processes = ProcessWatcher()
+        self.snapshot = None
+        self._snapshot_generation = 0  # Bumped whenever the snapshot goes stale
+        self._snapshot_lock = asyncio.Lock()
+        # Title patterns of files that haven't been checked yet
+        self.unchecked_patterns = {os.path.splitext(f)[0].lower() for f in files}
+    
+    def invalidate_snapshot(self):
+        """Drop the window snapshot, e.g. after a launch added new windows"""
+        self.snapshot = None
+        self._snapshot_generation += 1
+    
+    async def get_snapshot(self):
+        """Window snapshot shared between files; it is only refreshed after a launch"""
+        async with self._snapshot_lock:
+            snapshot = self.snapshot
+            if snapshot is None:
+                # Enumerate on a worker thread so other files keep going meanwhile
+                generation = self._snapshot_generation
+                patterns = frozenset(self.unchecked_patterns)
+                loop = asyncio.get_event_loop()
+                snapshot = await loop.run_in_executor(None, self._take_snapshot, patterns)
+                # Only share it if no launch happened while it was being taken
+                if generation == self._snapshot_generation:
+                    self.snapshot = snapshot
+            return snapshot
+    
+    def _take_snapshot(self, patterns):
+        """Enumerate windows and match every file still to be checked against them in one pass"""
+        snapshot = get_desktop_snapshot()
+        snapshot.match_titles(patterns)
+        return snapshot
+
+async def wait_for_start(filename, basename, launched, state):
+    """Wait until a launched file's program has started (or args.wait_time runs out)"""
+    args = state.args
+    loop = asyncio.get_event_loop()
+    
+    # Wait for process to start
+    target_info = state.target_cache[filename]
+    targetname = target_info[0]
+    
+    # Skip wait if we couldn't determine target
+    if targetname is None:
+        launched.close()
+        clear_progress()
+        print(f"  ! Cannot verify if {basename} started (unable to parse)")
+        return
+    
+    # Both waits below share one args.wait_time budget, measured from here
+    start = time.monotonic()
+    
+    # Block (on a worker thread) on the process itself until its input queue is idle
+    ready = await loop.run_in_executor(None, wait_for_input_idle, launched, args.wait_time)
+    launched.close()
+    if ready is not None:
+        clear_progress()
+        if ready:
+            print(f"  ✓ {basename} started successfully")
+        else:
+            print(f"  ! {basename} launched but not ready for input yet (may be starting slowly)")
+        return
+    
+    # Nothing to wait on (console program, or launched via another process).
+    # A multiple instance program can't be told apart from copies already
+    # running, so there's nothing to poll for; just give it a moment.
+    if should_allow_multiple(filename, targetname, args):
+        remaining = args.wait_time - (time.monotonic() - start)
+        await asyncio.sleep(max(0.0, min(MULTI_INSTANCE_WAIT, remaining)))
+        clear_progress()
+        print(f"  ✓ {basename} launched (multi-instance program)")
+        return
+    
+    # Otherwise poll for it. Executable targets are checked against a
+    # shared process-name snapshot; others need a window scan.
+    target_is_process = targetname.endswith(('.exe', '.com'))
+    filename_base = os.path.splitext(filename)[0].lower()
+    
+    # Poll with exponential backoff (50ms, 100ms, ... capped at 1s) so fast
+    # starters are noticed quickly while slow ones still get the full wait_time
+    elapsed = time.monotonic() - start  # Includes whatever the idle wait used up
+    iteration = 0
+    reported = int(elapsed)  # Whole seconds already shown in the progress output
+    started = False
+    
+    while elapsed < args.wait_time:
+        interval = min(POLL_MAX_INTERVAL, POLL_MIN_INTERVAL * 2 ** iteration,
+                       args.wait_time - elapsed)
+        iteration += 1
+        await asyncio.sleep(interval)
+        
+        # Check if process started
+        if target_is_process:
+            # Same matching rules as IsFileAlreadyRunning, so a shortcut to a
+            # launcher stub is still found by the name of what it started
+            procs_lower = await state.processes.running_names(interval)
+            started = find_running_process(procs_lower, filename_base, target_info[1],
+                                           target_info[2]) is not None
+        else:
+            started = await loop.run_in_executor(
+                None, IsFileAlreadyRunning, filename, args, None, target_info)
+        if started:
+            clear_progress()
+            print(f"  ✓ {basename} started successfully")
+            break
+        elapsed = time.monotonic() - start
+        if int(elapsed) > reported:
+            reported = int(elapsed)
+            show_progress(f"  Waiting for {basename} to start... ({reported}/{args.wait_time})")
+    
+    if not started:
+        clear_progress()
+        print(f"  ! {basename} launched but window not detected (may be starting slowly)")
+
+async def launch_one(filename, state, semaphore, target_lock):
+    """Check one file and launch it if it isn't already running"""
+    args = state.args
+    loop = asyncio.get_event_loop()
+    
+    async with target_lock, semaphore:
+        basename = os.path.splitext(filename)[0]
+        file_type = "native" if _ext_is_executable(filename) else "shortcut"
+        clear_progress()  # Other files may still be showing their wait progress
+        print(f"\nProcessing ({file_type}): {basename}")
+        
+        # For shortcuts, check if we can parse them
+        target_info = state.target_cache[filename]
+        if filename.endswith('.lnk') and target_info[0] is None:
+            print(f"  ✗ Skipping: Cannot parse shortcut file")
+            if not WIN32_AVAILABLE:
+                print(f"     Install pywin32 to enable .lnk file support")
+            return
+        
+        snapshot = await state.get_snapshot()
+        running = await loop.run_in_executor(None, IsFileAlreadyRunning,
+                                             filename, args, snapshot, target_info)
+        state.unchecked_patterns.discard(basename.lower())
+        clear_progress()
+        if running:
+            print(f"  → Skipping {basename} (already running)")
+            return
+        
+        print(f"  Launching: {basename}")
+        # Popen/ShellExecuteEx block, so launch on a worker thread
+        launched = await loop.run_in_executor(None, launch_file, filename, args)
+        if not launched:
+            return
+        
+        state.invalidate_snapshot()  # New windows may appear, re-enumerate for the next file
+        
+        wait_mode = get_wait_mode(filename, target_info[0], args)
+        if wait_mode == 'none':
+            # Fire and forget: no verification and no delay
+            launched.close()
+            print(f"  ✓ {basename} launched (not waiting)")
+        elif wait_mode == 'min':
+            launched.close()
+            await asyncio.sleep(MIN_WAIT)
+            clear_progress()
+            print(f"  ✓ {basename} launched")
+        else:
+            await wait_for_start(filename, basename, launched, state)
+        
+        # Mark as launched only now: IsFileAlreadyRunning treats launched files
+        # as running, which would make the start-up check above always succeed
+        launched_shortcuts.add(filename.lower())
+        
+        if wait_mode != 'none':
+            await asyncio.sleep(args.delay)  # Configurable pause between launches
+
+async def launch_files(files, args, target_cache):
+    """Process all files concurrently, at most args.max_concurrent_launches at a time"""
+    state = LaunchState(args, files, target_cache)
+    semaphore = asyncio.Semaphore(max(1, args.max_concurrent_launches))
+    
+    # Files that share a target run one after another, in order, so a
+    # single-instance program started by one is seen as running by the next
+    target_locks = {}
+    tasks = []
+    for filename in files:
+        key = (target_cache[filename][0] or filename).lower()
+        if key not in target_locks:
+            target_locks[key] = asyncio.Lock()
+        tasks.append(launch_one(filename, state, semaphore, target_locks[key]))
+    
+    await asyncio.gather(*tasks)
 
 def main():
     """Main execution"""
     # Parse command line arguments
     args = parse_arguments()
+    # Verbose output goes through our own logger only; leave the root logger
+    # alone so other libraries' debug messages don't show up in -v output
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(handler)
+    log.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    log.propagate = False
     
     print("Desktop Startup Script - Windows 11 Compatible Version")
     print("(Now with native file support!)")
@@ -619,72 +1773,79 @@ def main():
     print(f"  Native only: {args.native_only if hasattr(args, 'native_only') else False}")
     print(f"  Launch delay: {args.delay} seconds")
     print(f"  Max wait time: {args.wait_time} seconds")
-    if args.verbose:
-        print(f"  Recognized native extensions: {', '.join(sorted(EXECUTABLE_EXTENSIONS))}")
+    print(f"  Max concurrent launches: {args.max_concurrent_launches}")
+    print(f"  Wait mode: {args.wait_mode}")
+    if args.no_wait_programs:
+        print(f"  No-wait programs: {', '.join(sorted(args.no_wait_programs))}")
+    log.debug("  Recognized native extensions: %s", ', '.join(sorted(EXECUTABLE_EXTENSIONS)))
     
     # Collect files to process
     all_files = []
     
+    # Scan the directory once; every listing below is derived from these entries
+    entries = list(os.scandir('.'))
+    
+    # Lowercased extension of each entry, split once and reused by every filter below
+    file_ext = {e.name: os.path.splitext(e.name.rstrip())[1].lower() for e in entries}
+    
     # Debug: Show all files in directory first
-    if args.verbose:
-        print(f"\n=== Directory Contents ===")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("\n=== Directory Contents ===")
         try:
-            all_items = os.listdir('.')
-            print(f"Total items in directory: {len(all_items)}")
-            for item in sorted(all_items):
-                full_path = os.path.join('.', item)
-                if os.path.isdir(full_path):
-                    print(f"  [DIR]  {item}")
+            log.debug("Total items in directory: %d", len(entries))
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_dir():
+                    log.debug("  [DIR]  %s", entry.name)
                 else:
-                    size = os.path.getsize(full_path)
-                    print(f"  [FILE] {item} ({size} bytes)")
+                    log.debug("  [FILE] %s (%d bytes)", entry.name, entry.stat().st_size)
         except Exception as e:
-            print(f"Error listing directory: {e}")
-        print("=" * 30)
+            log.debug("Error listing directory: %s", e)
+        log.debug("=" * 30)
     
     if not args.native_only:
         # Add .lnk files
-        shortcuts = [f for f in os.listdir('.') if f.endswith('.lnk')]
+        shortcuts = [e.name for e in entries if e.name.endswith('.lnk') and e.is_file()]
         all_files.extend(shortcuts)
         print(f"\nFound {len(shortcuts)} .lnk shortcuts")
-        if args.verbose and shortcuts:
-            print(f"  Shortcuts: {', '.join(sorted(shortcuts))}")
+        if shortcuts:
+            log.debug("  Shortcuts: %s", ', '.join(sorted(shortcuts)))
     
     if args.include_native:
         # Add native executable files
-        native_files = [f for f in os.listdir('.') if is_native_executable(f)]
+        native_files = [e.name for e in entries
+                        if file_ext[e.name] in EXECUTABLE_EXTENSIONS and e.is_file()]
         # Apply --native-types filter if specified
         if args.native_types:
-            skipped = [f for f in native_files if os.path.splitext(f)[1].lower() not in args.native_types]
-            native_files = [f for f in native_files if os.path.splitext(f)[1].lower() in args.native_types]
+            skipped = [f for f in native_files if file_ext[f] not in args.native_types]
+            native_files = [f for f in native_files if file_ext[f] in args.native_types]
             if skipped:
                 print(f"  Filtered by --native-types {' '.join(sorted(args.native_types))}:")
                 print(f"    Skipped {len(skipped)}: {', '.join(sorted(skipped))}")
         all_files.extend(native_files)
         print(f"Found {len(native_files)} native executables")
         if native_files:
-            if args.verbose:
-                print(f"  Native files: {', '.join(sorted(native_files))}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("  Native files: %s", ', '.join(sorted(native_files)))
                 # Extra debug: check each native file extension
                 for nf in sorted(native_files):
-                    ext = os.path.splitext(nf)[1].lower()
-                    print(f"    - {nf} (ext: '{ext}')")
+                    log.debug("    - %s (ext: '%s')", nf, file_ext[nf])
         else:
             # Debug: Let's see what files were skipped
-            if args.verbose:
-                print("  No native executables found. Checking what was skipped...")
-                for f in os.listdir('.'):
-                    if not f.endswith('.lnk') and os.path.isfile(f):
-                        ext = os.path.splitext(f)[1].lower()
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("  No native executables found. Checking what was skipped...")
+                for entry in entries:
+                    if not entry.name.endswith('.lnk') and entry.is_file():
+                        ext = file_ext[entry.name]
                         is_exec = ext in EXECUTABLE_EXTENSIONS
-                        print(f"    - {f} (ext: '{ext}', is_executable: {is_exec})")
+                        log.debug("    - %s (ext: '%s', is_executable: %s)", entry.name, ext, is_exec)
     else:
-        if args.verbose:
-            print("\nNative files DISABLED (--no-native flag used)")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("\nNative files DISABLED (--no-native flag used)")
             # Show what native files would have been processed
-            native_files = [f for f in os.listdir('.') if is_native_executable(f)]
+            native_files = [e.name for e in entries
+                            if file_ext[e.name] in EXECUTABLE_EXTENSIONS and e.is_file()]
             if native_files:
-                print(f"  Skipping {len(native_files)} native files: {', '.join(sorted(native_files))}")
+                log.debug("  Skipping %d native files: %s", len(native_files), ', '.join(sorted(native_files)))
     
     if not all_files:
         print("\nNo startup files found")
@@ -697,11 +1858,14 @@ def main():
     
     print(f"\nTotal files to process: {len(all_files)}")
     
+    # Resolve every file's target once; shortcuts need a WScript.Shell round-trip each
+    target_cache = resolve_targets(all_files)
+    
     # Group files by their target to detect intentional duplicates
     file_targets = {}
     unparseable_shortcuts = []
     for file in all_files:
-        targetname, _, _ = get_target_info(file, args)
+        targetname, _, _ = target_cache[file]
         if targetname is None and file.endswith('.lnk'):
             unparseable_shortcuts.append(file)
             continue
@@ -727,60 +1891,15 @@ def main():
     # Clear launched files at start of each run
     launched_shortcuts.clear()
     
-    for filename in all_files:
-        basename = os.path.splitext(filename)[0]
-        file_type = "native" if is_native_executable(filename) else "shortcut"
-        print(f"\nProcessing ({file_type}): {basename}")
-        
-        # For shortcuts, check if we can parse them
-        if filename.endswith('.lnk'):
-            targetname, _, _ = get_target_info(filename, args)
-            if targetname is None:
-                print(f"  ✗ Skipping: Cannot parse shortcut file")
-                if not WIN32_AVAILABLE:
-                    print(f"     Install pywin32 to enable .lnk file support")
-                continue
-        
-        if not IsFileAlreadyRunning(filename, args):
-            print(f"  Launching: {basename}")
-            
-            if launch_file(filename, args):
-                # Mark as launched
-                launched_shortcuts.add(filename.lower())
-                
-                # Wait for process to start
-                counter = 0
-                targetname, _, _ = get_target_info(filename, args)
-                
-                # Skip wait if we couldn't determine target
-                if targetname is None:
-                    print(f"  ! Cannot verify if {basename} started (unable to parse)")
-                    time.sleep(args.delay)
-                    continue
-                
-                while counter < args.wait_time:
-                    counter += 1
-                    time.sleep(1)
-                    
-                    # For multiple instance programs, just wait a bit
-                    if should_allow_multiple(filename, targetname, args):
-                        print(f"  Waiting for {basename}... ({counter}/{args.wait_time})")
-                        if counter >= 2:  # Shorter wait for known multi-instance programs
-                            print(f"  ✓ {basename} launched (multi-instance program)")
-                            break
-                    else:
-                        # Check if process started for single-instance programs
-                        if IsFileAlreadyRunning(filename, args):
-                            print(f"  ✓ {basename} started successfully")
-                            break
-                        print(f"  Waiting for {basename} to start... ({counter}/{args.wait_time})")
-                
-                if counter >= args.wait_time:
-                    print(f"  ! {basename} launched but window not detected (may be starting slowly)")
-                
-                time.sleep(args.delay)  # Configurable pause between launches
-        else:
-            print(f"  → Skipping {basename} (already running)")
+    # Set the event loop up by hand, asyncio.run() needs Python 3.7+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(launch_files(all_files, args, target_cache))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+        close_detector()
     
     print("\nDesktop initialization complete!")
     print(f"Launched {len(launched_shortcuts)} new file(s)")